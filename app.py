@@ -1,15 +1,22 @@
 import streamlit as st
 import pandas as pd
-import pdfplumber
 import yaml
 import io
 import base64
+import zipfile
 from docx import Document
 from docx.shared import Pt
 from datetime import datetime
 from openpyxl import Workbook
 from pathlib import Path
 
+import profiling
+import results_ledger
+import text_viewer
+from scoring import dictamen_text, weighted_score
+from streaming_score import StreamingEvaluation
+from word_utils_fix import add_evidence_annex, add_full_text_bulk
+
 _APP_DIR = Path(__file__).resolve().parent
 
 # Mismo PNG en `assets/` (push a main). Fallback por URL cuando el archivo aún no está en el deploy.
@@ -48,7 +55,8 @@ st.set_page_config(layout="wide")
 # ============================
 # CONFIGURACIÓN
 # ============================
-with open(_APP_DIR / "rubric_config.yaml", "r", encoding="utf-8") as f:
+_RUBRIC_PATH = _APP_DIR / "rubric_config.yaml"
+with open(_RUBRIC_PATH, "r", encoding="utf-8") as f:
     config = yaml.safe_load(f)
 
 weights = config["weights"]
@@ -61,75 +69,64 @@ def criterion_label(key: str) -> str:
     """Nombre para UI y exportación (Anexo V / instructivo)."""
     return labels.get(key, key.replace("_", " ").title())
 
+
+# Rúbricas adicionales (mismo formato que rubric_config.yaml), p. ej. informe final.
+_RUBRICS_DIR = _APP_DIR / "rubrics"
+
+
+@st.cache_data
+def _load_extra_rubric(name: str, mtime: float) -> dict:
+    """Lee y valida `rubrics/<name>.yaml`; `mtime` invalida la caché al editar el archivo."""
+    try:
+        with open(_RUBRICS_DIR / f"{name}.yaml", "r", encoding="utf-8") as f:
+            rubrica = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as exc:
+        raise ValueError(f"no se pudo leer: {exc}") from None
+    if not isinstance(rubrica, dict):
+        raise ValueError("se esperaba un mapa con weights, thresholds y keywords")
+    r_weights = rubrica.get("weights")
+    r_thresholds = rubrica.get("thresholds")
+    r_keywords = rubrica.get("keywords")
+    if not isinstance(r_weights, dict) or not r_weights or not all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in r_weights.values()
+    ):
+        raise ValueError("`weights` debe ser un mapa criterio → peso numérico")
+    if not isinstance(r_thresholds, dict) or not all(
+        isinstance(r_thresholds.get(k), (int, float)) for k in ("aprobado", "aprobado_obs")
+    ):
+        raise ValueError("`thresholds` debe tener `aprobado` y `aprobado_obs` numéricos")
+    if not isinstance(r_keywords, dict) or not all(
+        isinstance(v, list) and all(isinstance(k, str) for k in v) for v in r_keywords.values()
+    ):
+        raise ValueError("`keywords` debe ser un mapa criterio → lista de indicios")
+    if set(r_keywords) != set(r_weights):
+        raise ValueError(
+            f"criterios distintos en weights y keywords: {sorted(set(r_weights) ^ set(r_keywords))}"
+        )
+    if not isinstance(rubrica.get("labels") or {}, dict):
+        raise ValueError("`labels` debe ser un mapa criterio → nombre")
+    return rubrica
+
+
+def load_extra_rubric(name: str) -> dict:
+    """`rubrics/<name>.yaml` validado; lanza ValueError si el formato no es válido."""
+    try:
+        mtime = (_RUBRICS_DIR / f"{name}.yaml").stat().st_mtime
+    except OSError as exc:
+        raise ValueError(f"no se pudo leer: {exc}") from None
+    return _load_extra_rubric(name, mtime)
+
 # ============================
 # FUNCIONES
 # ============================
-def _docx_paragraphs_and_tables(doc: Document) -> str:
-    """Incluye tablas (plantilla Anexo II suele tener datos en celdas)."""
-    parts: list[str] = []
-    for p in doc.paragraphs:
-        t = (p.text or "").strip()
-        if t:
-            parts.append(p.text)
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                c = (cell.text or "").strip()
-                if c:
-                    parts.append(c)
-    return "\n".join(parts)
-
-
-def extract_text(file):
-    """Extrae texto desde PDF o DOCX."""
-    if file.name.endswith(".pdf"):
-        text = ""
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                text += (page.extract_text() or "") + "\n"
-        return text
-    if file.name.endswith(".docx"):
-        doc = Document(file)
-        return _docx_paragraphs_and_tables(doc)
-    return ""
-
-def auto_score(text, keywords_dict):
-    """
-    Puntaje automático 0–4 por criterio según cobertura de indicios normativos
-    (listas `keywords` en rubric_config.yaml). Mapea la proporción de indicios
-    hallados en el texto a la escala 0–4 del Anexo V.
-    """
-    text_low = (text or "").lower()
-    scores: dict[str, int] = {}
-    for section, keys in keywords_dict.items():
-        keylist = [(k or "").strip() for k in keys if (k or "").strip()]
-        if not keylist:
-            scores[section] = 0
-            continue
-        hits = sum(1 for k in keylist if k.lower() in text_low)
-        ratio = hits / len(keylist)
-        # Umbrales de cobertura → escala cualitativa 0–4
-        if ratio >= 0.45:
-            scores[section] = 4
-        elif ratio >= 0.30:
-            scores[section] = 3
-        elif ratio >= 0.15:
-            scores[section] = 2
-        elif ratio > 0:
-            scores[section] = 1
-        else:
-            scores[section] = 0
-    return scores
-
-def weighted_score(scores, weights):
-    """Calcula el puntaje total ponderado (%) a partir de puntajes 0–4"""
-    total = sum(scores[s] * weights[s] for s in scores)
-    max_total = sum(weights.values()) * 4
-    percent = (total / max_total) * 100 if max_total > 0 else 0.0
-    return percent
-
-def generate_excel(scores, percent, thresholds, label_fn=None):
-    """Genera archivo Excel con resultados."""
+@st.cache_resource
+def _ledger():
+    """Conexión compartida al historial de valoraciones (SQLite)."""
+    return results_ledger.connect()
+
+
+def generate_excel(scores, percent, thresholds, label_fn=None, output=None):
+    """Genera archivo Excel con resultados (en `output` si se indica, p. ej. una entrada de ZIP)."""
     label_fn = label_fn or (lambda k: str(k))
     wb = Workbook()
     ws = wb.active
@@ -146,13 +143,16 @@ def generate_excel(scores, percent, thresholds, label_fn=None):
     else:
         result = "No aprobado"
     ws.append(["Dictamen", result])
+    if output is not None:
+        wb.save(output)
+        return output
     output = io.BytesIO()
     wb.save(output)
     output.seek(0)
     return output
 
-def generate_word(scores, percent, thresholds, nombre_proyecto="", label_fn=None):
-    """Genera dictamen Word incluyendo el nombre del proyecto."""
+def generate_word(scores, percent, thresholds, nombre_proyecto="", label_fn=None, output=None):
+    """Genera dictamen Word incluyendo el nombre del proyecto (en `output` si se indica)."""
     label_fn = label_fn or (lambda k: str(k))
     doc = Document()
     style = doc.styles["Normal"]
@@ -201,11 +201,113 @@ def generate_word(scores, percent, thresholds, nombre_proyecto="", label_fn=None
     doc.add_paragraph("..............................................................................")
     doc.add_paragraph("..............................................................................")
 
+    if output is not None:
+        doc.save(output)
+        return output
     output = io.BytesIO()
     doc.save(output)
     output.seek(0)
     return output
 
+
+def keyword_evidence(text, keywords_dict, width=80):
+    """
+    Fragmentos del texto donde aparece cada indicio hallado (primera aparición),
+    por criterio: {criterio: [(indicio, fragmento), ...]}.
+    """
+    text = text or ""
+    text_low = text.lower()
+    evidence: dict[str, list[tuple[str, str]]] = {}
+    for section, keys in keywords_dict.items():
+        found = []
+        for k in keys:
+            k = (k or "").strip()
+            if not k:
+                continue
+            pos = text_low.find(k.lower())
+            if pos < 0:
+                continue
+            start = max(0, pos - width)
+            end = min(len(text), pos + len(k) + width)
+            snippet = " ".join(text[start:end].split())
+            found.append((k, snippet))
+        evidence[section] = found
+    return evidence
+
+
+def generate_evidence_annex(evidence, nombre_proyecto="", label_fn=None, output=None):
+    """Anexo Word sólo con los fragmentos donde aparecen los indicios hallados."""
+    doc = Document()
+    style = doc.styles["Normal"]
+    style.font.name = "Arial"
+    style.font.size = Pt(11)
+    nombre_clean = (nombre_proyecto or "").strip()
+    titulo = "Anexo de evidencias"
+    if nombre_clean:
+        titulo = f'{titulo} "Del proyecto {nombre_clean}"'
+    add_evidence_annex(doc, evidence, label_fn=label_fn, titulo=titulo)
+    if output is not None:
+        doc.save(output)
+        return output
+    output = io.BytesIO()
+    doc.save(output)
+    output.seek(0)
+    return output
+
+
+def generate_text_annex(text, nombre_proyecto="", output=None):
+    """Anexo Word con el texto extraído completo (XML en bloque: un párrafo por bloque)."""
+    doc = Document()
+    style = doc.styles["Normal"]
+    style.font.name = "Arial"
+    style.font.size = Pt(11)
+    nombre_clean = (nombre_proyecto or "").strip()
+    titulo = "Anexo: texto extraído"
+    if nombre_clean:
+        titulo = f'{titulo} "Del proyecto {nombre_clean}"'
+    doc.add_heading(titulo, level=2)
+    add_full_text_bulk(doc, text)
+    if output is not None:
+        doc.save(output)
+        return output
+    output = io.BytesIO()
+    doc.save(output)
+    output.seek(0)
+    return output
+
+
+def generate_zip(
+    scores,
+    percent,
+    thresholds,
+    nombre_proyecto="",
+    label_fn=None,
+    extracted_text=None,
+    evidence=None,
+):
+    """
+    Un único ZIP con Excel y Word (y opcionalmente texto extraído, en .txt y como anexo
+    Word, y anexo de evidencias).
+    Cada archivo se escribe directamente en su entrada del ZIP: no hay buffers intermedios.
+    """
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("valoracion_informe_avance.xlsx", "w") as fh:
+            generate_excel(scores, percent, thresholds, label_fn=label_fn, output=fh)
+        with zf.open("valoracion_informe_avance.docx", "w") as fh:
+            generate_word(
+                scores, percent, thresholds, nombre_proyecto, label_fn=label_fn, output=fh
+            )
+        if extracted_text:
+            zf.writestr("texto_extraido.txt", extracted_text)
+            with zf.open("anexo_texto_extraido.docx", "w") as fh:
+                generate_text_annex(extracted_text, nombre_proyecto, output=fh)
+        if evidence:
+            with zf.open("anexo_evidencias.docx", "w") as fh:
+                generate_evidence_annex(evidence, nombre_proyecto, label_fn=label_fn, output=fh)
+    output.seek(0)
+    return output
+
 # ============================
 # INTERFAZ STREAMLIT
 # ============================
@@ -529,24 +631,106 @@ uploaded_file = st.file_uploader(
     key="upload_informe_avance",
 )
 
-if uploaded_file:
-    text = extract_text(uploaded_file)
-
-    with st.expander("Ver texto extraído"):
-        st.text_area("Texto completo", text, height=300)
+# Perfilado opcional (ver profiling.py): apagado no agrega trabajo al rerun.
+profiling_on = profiling.ENV_ENABLED
 
-    # --- Evaluación automática (referencia) ---
-    st.subheader("Evaluación automática")
-    auto_scores = auto_score(text, keywords)
-    df = pd.DataFrame(
-        [(criterion_label(k), v) for k, v in auto_scores.items()],
-        columns=["Criterio", "Puntaje (0–4)"],
+rubricas_disponibles = (
+    sorted(p.stem for p in _RUBRICS_DIR.glob("*.yaml")) if _RUBRICS_DIR.is_dir() else []
+)
+rubricas_extra = {}
+if rubricas_disponibles:
+    for nombre in st.sidebar.multiselect(
+        "Rúbricas adicionales (misma lectura del informe)", rubricas_disponibles
+    ):
+        try:
+            rubricas_extra[nombre] = load_extra_rubric(nombre)
+        except ValueError as exc:
+            st.error(f"Rúbrica adicional `{nombre}` omitida: {exc}")
+if profiling.ADMIN_TOGGLE:
+    profiling_on = st.sidebar.toggle("Perfilado (cProfile + tracemalloc)", value=profiling_on)
+
+modo_lectura = st.radio(
+    "Lectura del informe",
+    ["Completa", "Vista rápida"],
+    horizontal=True,
+    help=(
+        "Vista rápida: deja de leer cuando todos los criterios alcanzan el puntaje máximo "
+        "o se agota el presupuesto de páginas (el texto extraído queda parcial)."
+    ),
+)
+vista_rapida = modo_lectura == "Vista rápida"
+page_budget = None
+if vista_rapida:
+    # En DOCX el presupuesto cuenta bloques de texto (párrafos y celdas), no páginas.
+    es_docx = uploaded_file is not None and uploaded_file.name.endswith(".docx")
+    page_budget = int(
+        st.number_input(
+            "Máximo de bloques de texto (párrafos y celdas) a leer" if es_docx else "Máximo de páginas a leer",
+            1,
+            5000,
+            20,
+            key="presupuesto_lectura",
+        )
     )
-    st.dataframe(df, use_container_width=True)
-
-    auto_percent = weighted_score(auto_scores, weights)
-    st.metric(label="Puntaje automático inicial (%)", value=round(auto_percent, 2))
 
+# Visor en un fragmento: navegar reejecuta sólo el visor, no la extracción ni el
+# puntaje. El índice de ventanas y de indicios se guarda en la sesión por `file_id`
+# de la carga (sin hashear el archivo en cada rerun).
+@st.fragment
+def text_viewer_panel(text, chunk_offsets, es_pdf, file_id):
+    cache_key = (file_id, len(text))
+    cached = st.session_state.get("_visor_indice")
+    if cached is None or cached[0] != cache_key:
+        ventanas = text_viewer.window_index(text, chunk_offsets, merge_chunks=not es_pdf)
+        cached = (cache_key, ventanas, text_viewer.keyword_hit_windows(text, keywords, ventanas))
+        st.session_state["_visor_indice"] = cached
+    _, ventanas, hits = cached
+    unidad = "Página" if es_pdf else "Sección"
+    if not 1 <= st.session_state.get("visor_ventana", 1) <= len(ventanas):
+        st.session_state["visor_ventana"] = 1
+
+    def _ir_a_indicio():
+        kw = st.session_state.get("visor_indicio")
+        if kw:
+            st.session_state["visor_ventana"] = hits[kw][0] + 1
+
+    def _ir_a_aparicion(key):
+        ventana = st.session_state.get(key)
+        if ventana:
+            st.session_state["visor_ventana"] = ventana
+
+    nav1, nav2, nav3 = st.columns(3)
+    with nav1:
+        ventana = st.number_input(
+            f"{unidad} (de {len(ventanas)})", 1, len(ventanas), key="visor_ventana"
+        )
+    with nav2:
+        indicio = st.selectbox(
+            "Ir a indicio",
+            [""] + sorted(hits),
+            format_func=lambda k: f"{k} ({len(hits[k])} {unidad.lower()}s)" if k else "—",
+            key="visor_indicio",
+            on_change=_ir_a_indicio,
+        )
+    with nav3:
+        if indicio in hits:
+            st.selectbox(
+                "Aparición",
+                [w + 1 for w in hits[indicio]],
+                format_func=lambda w: f"{unidad} {w}",
+                key=f"visor_aparicion_{indicio}",
+                on_change=_ir_a_aparicion,
+                args=(f"visor_aparicion_{indicio}",),
+            )
+    inicio, fin = text_viewer.window_bounds(ventanas, len(text), ventana - 1)
+    st.text_area(f"{unidad} {ventana}", text[inicio:fin], height=300)
+    st.caption(f"Caracteres {inicio:,}–{fin:,} de {len(text):,}")
+
+
+# Ajuste manual y dictamen en un fragmento: mover un slider reejecuta sólo esta
+# sección (recalcula el puntaje ponderado), no la extracción ni el puntaje automático.
+@st.fragment
+def manual_adjustment(auto_scores, auto_percent, text, file_name, prof_tags, complete=True):
     # --- Ajuste manual ---
     st.subheader("Ajuste manual (opcional)")
     manual_scores = {}
@@ -573,32 +757,215 @@ if uploaded_file:
 
     # Nombre del proyecto para el Word
     nombre_proyecto = st.text_input("Nombre del proyecto (aparecerá en el Word):", "")
-
-    # Generar informes SIEMPRE con los valores ajustados
-    if st.button("Generar informes", type="primary"):
+    periodo = st.text_input("Período / convocatoria (para el historial):", "")
+
+    # Formato de descarga: un único ZIP evita enviar dos payloads al navegador.
+    descarga_zip = st.checkbox("Descargar todo en un único ZIP", value=True)
+    if descarga_zip:
+        zip_col1, zip_col2 = st.columns(2)
+        with zip_col1:
+            zip_texto = st.checkbox("Incluir texto extraído (.txt y anexo Word)", value=False)
+        with zip_col2:
+            zip_evidencias = st.checkbox("Incluir anexo de evidencias", value=False)
+
+    # Generar informes SIEMPRE con los valores ajustados. Con lectura parcial (vista
+    # rápida) los puntajes no son definitivos: no se exportan ni se registran.
+    if not complete:
+        st.caption("Para generar los informes y registrar la valoración, usá lectura completa.")
+    if st.button("Generar informes", type="primary", disabled=not complete):
         final_percent = adjusted_percent
-        excel_file = generate_excel(
-            manual_scores, final_percent, thresholds, label_fn=criterion_label
+        # Sólo se registra con proyecto y período: sin ellos la fila no se puede consultar.
+        if nombre_proyecto.strip() and periodo.strip():
+            evaluation_id = results_ledger.record_evaluation(
+                _ledger(),
+                project=nombre_proyecto,
+                period=periodo,
+                rubric=results_ledger.rubric_hash(_RUBRIC_PATH),
+                auto_scores=auto_scores,
+                manual_scores=manual_scores,
+                auto_percent=auto_percent,
+                percent=final_percent,
+                dictamen=dictamen_text(final_percent, thresholds),
+                file_name=file_name,
+            )
+            if evaluation_id is None:
+                st.info("Esta valoración ya estaba registrada en el historial.")
+        else:
+            st.warning("Completá el nombre del proyecto y el período para registrar la valoración en el historial.")
+
+        with profiling.profile_stage("exportacion", profiling_on, **prof_tags):
+            if descarga_zip:
+                zip_file = generate_zip(
+                    manual_scores,
+                    final_percent,
+                    thresholds,
+                    nombre_proyecto,
+                    label_fn=criterion_label,
+                    extracted_text=text if zip_texto else None,
+                    evidence=keyword_evidence(text, keywords) if zip_evidencias else None,
+                )
+                st.download_button(
+                    "⬇️ Descargar informes (ZIP)",
+                    zip_file,
+                    file_name="valoracion_informe_avance.zip",
+                    mime="application/zip",
+                    type="primary",
+                )
+            else:
+                excel_file = generate_excel(
+                    manual_scores, final_percent, thresholds, label_fn=criterion_label
+                )
+                word_file = generate_word(
+                    manual_scores,
+                    final_percent,
+                    thresholds,
+                    nombre_proyecto,
+                    label_fn=criterion_label,
+                )
+                st.download_button(
+                    "⬇️ Descargar Excel",
+                    excel_file,
+                    file_name="valoracion_informe_avance.xlsx",
+                    type="primary",
+                )
+                st.download_button(
+                    "⬇️ Descargar Word",
+                    word_file,
+                    file_name="valoracion_informe_avance.docx",
+                    type="primary",
+                )
+
+        st.success("Informe generado con los puntajes ajustados manualmente.")
+
+
+if uploaded_file:
+    prof_tags = {}
+    if profiling_on:
+        prof_tags = {
+            "file_name": uploaded_file.name,
+            "file_hash": profiling.file_hash(uploaded_file.getvalue()),
+        }
+
+    # Extracción y puntaje en una sola pasada, con puntajes provisorios por página.
+    with profiling.profile_stage("extraccion", profiling_on, **prof_tags) as stage_tags:
+        # Todas las rúbricas se puntúan en la misma pasada, con un único buscador de indicios.
+        evaluation = StreamingEvaluation(
+            uploaded_file,
+            keywords,
+            preview=vista_rapida,
+            page_budget=page_budget,
+            extra_rubrics={n: r["keywords"] for n, r in rubricas_extra.items()},
         )
-        word_file = generate_word(
-            manual_scores,
-            final_percent,
-            thresholds,
-            nombre_proyecto,
-            label_fn=criterion_label,
+        provisional = st.empty()
+        for update in evaluation.updates():
+            with provisional.container():
+                unidad = f"de {update.total_pages} páginas" if update.total_pages else "bloques"
+                st.caption(f"Leyendo… {update.pages} {unidad} · puntajes provisorios")
+                st.dataframe(
+                    pd.DataFrame(
+                        [(criterion_label(k), v) for k, v in update.scores.items()],
+                        columns=["Criterio", "Puntaje (0–4)"],
+                    ),
+                    use_container_width=True,
+                )
+        provisional.empty()
+        text = evaluation.text
+        # La cantidad de páginas sale de la misma apertura del PDF que la extracción.
+        stage_tags["pages"] = evaluation.total_pages
+    if profiling_on:
+        prof_tags["pages"] = evaluation.total_pages
+
+    if not evaluation.complete:
+        unidad = f"de {evaluation.total_pages} páginas" if evaluation.total_pages else "bloques"
+        st.warning(
+            f"Vista rápida: se leyeron {evaluation.pages} {unidad}. "
+            "El texto extraído y los puntajes no saturados son parciales; usá lectura completa para el dictamen."
+        )
+
+    # Visor paginado: sólo viaja al navegador la ventana visible, no el texto completo.
+    with st.expander("Ver texto extraído"):
+        text_viewer_panel(
+            text,
+            evaluation.chunk_offsets,
+            evaluation.total_pages is not None,
+            uploaded_file.file_id,
         )
 
-        st.download_button(
-            "⬇️ Descargar Excel",
-            excel_file,
-            file_name="valoracion_informe_avance.xlsx",
-            type="primary",
+    # --- Evaluación automática (referencia) ---
+    st.subheader("Evaluación automática")
+    # Idéntico a scoring.auto_score(text, keywords) cuando la lectura es completa.
+    # El puntaje ocurre durante la extracción y queda en el perfil "extraccion".
+    auto_scores = evaluation.scores()
+    df = pd.DataFrame(
+        [(criterion_label(k), v) for k, v in auto_scores.items()],
+        columns=["Criterio", "Puntaje (0–4)"],
+    )
+    st.dataframe(df, use_container_width=True)
+
+    auto_percent = weighted_score(auto_scores, weights)
+    st.metric(label="Puntaje automático inicial (%)", value=round(auto_percent, 2))
+
+    # --- Otras rúbricas (automático, lado a lado) ---
+    if rubricas_extra:
+        st.subheader("Comparación entre rúbricas")
+        extra_scores = evaluation.rubric_scores()
+        columnas = st.columns(1 + len(rubricas_extra))
+        with columnas[0]:
+            st.markdown(f"**{config.get('name', 'Informe de avance')}**")
+            st.metric("Puntaje automático (%)", round(auto_percent, 2))
+            st.caption(f"Dictamen: {dictamen_text(auto_percent, thresholds)}")
+        for col, (nombre, rubrica) in zip(columnas[1:], rubricas_extra.items()):
+            r_labels = rubrica.get("labels") or {}
+            r_scores = extra_scores.get(nombre, {})
+            r_percent = weighted_score(r_scores, rubrica["weights"])
+            with col:
+                st.markdown(f"**{rubrica.get('name', nombre)}**")
+                st.metric("Puntaje automático (%)", round(r_percent, 2))
+                st.caption(f"Dictamen: {dictamen_text(r_percent, rubrica['thresholds'])}")
+                st.dataframe(
+                    pd.DataFrame(
+                        [
+                            (r_labels.get(k, k.replace("_", " ").title()), v)
+                            for k, v in r_scores.items()
+                        ],
+                        columns=["Criterio", "Puntaje (0–4)"],
+                    ),
+                    use_container_width=True,
+                )
+
+    manual_adjustment(
+        auto_scores, auto_percent, text, uploaded_file.name, prof_tags, evaluation.complete
+    )
+
+# --- Historial de valoraciones ---
+# En un fragmento: cambiar proyecto o período sólo reconsulta el historial, no
+# vuelve a extraer ni puntuar el informe cargado.
+@st.fragment
+def ledger_history():
+    conn = _ledger()
+    hist_col1, hist_col2 = st.columns(2)
+    with hist_col1:
+        proyecto_sel = st.selectbox(
+            "Proyecto", [""] + results_ledger.list_projects(conn), key="hist_proyecto"
+        )
+    with hist_col2:
+        periodo_sel = st.selectbox(
+            "Período", [""] + results_ledger.list_periods(conn), key="hist_periodo"
         )
-        st.download_button(
-            "⬇️ Descargar Word",
-            word_file,
-            file_name="valoracion_informe_avance.docx",
-            type="primary",
+    if proyecto_sel:
+        st.markdown("**Evaluaciones del proyecto**")
+        st.dataframe(
+            pd.DataFrame(results_ledger.project_history(conn, proyecto_sel)),
+            use_container_width=True,
         )
+    dist = pd.DataFrame(results_ledger.criterion_distribution(conn, periodo_sel or None))
+    if not dist.empty:
+        dist["criterion"] = dist["criterion"].map(criterion_label)
+    st.markdown("**Distribución por criterio**")
+    st.dataframe(dist, use_container_width=True)
+    st.markdown("**Resumen por período**")
+    st.dataframe(pd.DataFrame(results_ledger.period_summary(conn)), use_container_width=True)
 
-        st.success("Informe generado con los puntajes ajustados manualmente.")
+
+with st.expander("Historial de valoraciones"):
+    ledger_history()
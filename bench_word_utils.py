@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compara `add_full_text` (un párrafo por línea) con `add_full_text_bulk` (XML en bloque)
+al anexar un texto extraído largo al dictamen Word.
+Uso:
+  python bench_word_utils.py
+  python bench_word_utils.py --pages 200 --lines-per-page 45
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import time
+
+from docx import Document
+
+from word_utils_fix import add_full_text, add_full_text_bulk
+
+_WORDS = (
+    "objetivo cronograma metodología resultados avance investigación equipo director "
+    "encuesta muestra difusión congreso publicación formación becario gestión ética"
+).split()
+
+
+def sample_text(pages: int, lines_per_page: int, seed: int = 0) -> str:
+    """Texto tipo extracción de PDF: líneas cortas y una línea en blanco entre párrafos."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(pages):
+        for i in range(lines_per_page):
+            lines.append(" ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14))))
+            if i % 8 == 7:
+                lines.append("")
+    return "\n".join(lines)
+
+
+def _measure(fn, text: str) -> tuple[float, int, int]:
+    doc = Document()
+    t0 = time.perf_counter()
+    fn(doc, text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    elapsed = time.perf_counter() - t0
+    return elapsed, len(doc.paragraphs), buf.tell()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del anexo de texto completo en Word.")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--lines-per-page", type=int, default=45)
+    args = parser.parse_args(argv)
+
+    text = sample_text(args.pages, args.lines_per_page)
+    print(f"Texto: {args.pages} páginas, {text.count(chr(10)) + 1} líneas, {len(text) / 1024:.0f} KiB")
+    results = {}
+    for name, fn in (("add_full_text", add_full_text), ("add_full_text_bulk", add_full_text_bulk)):
+        elapsed, paragraphs, size = _measure(fn, text)
+        results[name] = elapsed
+        print(f"  {name:<20} {elapsed:7.2f} s · {paragraphs:6d} párrafos · docx {size / 1024:7.0f} KiB")
+    print(f"Aceleración: {results['add_full_text'] / results['add_full_text_bulk']:.1f}×")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Validación diferencial de motores de extracción/puntaje contra la ruta de referencia.
+
+La referencia es `scoring.extract_text` + `auto_score` + `weighted_score`. Cada
+motor candidato recibe el mismo informe y devuelve (texto, puntajes). Se reportan
+todos los criterios cuyo puntaje difiere, los cambios de porcentaje y de
+dictamen, y un resumen de exactitud y aceleración. La salida es 1 si algún
+dictamen o criterio difiere, para usarlo como compuerta antes de publicar un motor.
+
+Uso:
+  python differential_check.py corpus/
+  python differential_check.py corpus/ --engine streaming --engine mi_modulo:mi_motor
+  python differential_check.py --make-fixtures corpus/   # corpus sintético (PDF, DOCX con celdas
+                                                         # combinadas y textos con acentos)
+
+Un motor externo `modulo:funcion` tiene la firma `funcion(file, keywords) -> (texto, puntajes)`,
+donde `file` es un BytesIO con atributo `name` (como el archivo subido en la app).
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import yaml
+from docx import Document
+
+from scoring import auto_score, dictamen_text, extract_text, weighted_score
+from streaming_score import StreamingEvaluation
+
+_APP_DIR = Path(__file__).resolve().parent
+
+Engine = Callable[[io.BytesIO, dict], "tuple[str, dict[str, int]]"]
+
+
+def reference_engine(file, keywords: dict):
+    text = extract_text(file)
+    return text, auto_score(text, keywords)
+
+
+def streaming_engine(file, keywords: dict):
+    evaluation = StreamingEvaluation(file, keywords)
+    for _ in evaluation.updates():
+        pass
+    return evaluation.text, evaluation.scores()
+
+
+def streaming_preview_engine(file, keywords: dict):
+    evaluation = StreamingEvaluation(file, keywords, preview=True)
+    for _ in evaluation.updates():
+        pass
+    return evaluation.text, evaluation.scores()
+
+
+BUILTIN_ENGINES: dict[str, Engine] = {
+    "streaming": streaming_engine,
+    "streaming-preview": streaming_preview_engine,
+}
+
+
+def load_engine(spec: str) -> Engine:
+    if spec in BUILTIN_ENGINES:
+        return BUILTIN_ENGINES[spec]
+    module_name, _, func_name = spec.partition(":")
+    if not func_name:
+        raise ValueError(f"motor desconocido {spec!r} (usar `modulo:funcion`)")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _open(path: Path, data: bytes) -> io.BytesIO:
+    f = io.BytesIO(data)
+    f.name = path.name
+    return f
+
+
+def _timed(engine: Engine, path: Path, data: bytes, keywords: dict, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = engine(_open(path, data), keywords)
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def compare_file(path: Path, engines: dict[str, Engine], config: dict, repeat: int) -> dict:
+    """
+    Corre referencia y candidatos sobre un informe y devuelve las diferencias. Si
+    un motor (o la referencia) lanza una excepción, queda registrada en `error` y
+    se sigue con el resto.
+    """
+    keywords, weights, thresholds = config["keywords"], config["weights"], config["thresholds"]
+    row = {"file": path.name, "reference": None, "engines": {}}
+    try:
+        data = path.read_bytes()
+        (ref_text, ref_scores), ref_time = _timed(reference_engine, path, data, keywords, repeat)
+    except Exception as exc:
+        row["error"] = f"referencia: {type(exc).__name__}: {exc}"
+        return row
+    ref_percent = weighted_score(ref_scores, weights)
+    ref_dictamen = dictamen_text(ref_percent, thresholds)
+    row["reference"] = {
+        "seconds": ref_time,
+        "percent": ref_percent,
+        "dictamen": ref_dictamen,
+        "scores": ref_scores,
+    }
+    for name, engine in engines.items():
+        try:
+            (text, scores), elapsed = _timed(engine, path, data, keywords, repeat)
+            percent = weighted_score(scores, weights)
+        except Exception as exc:
+            row["engines"][name] = {"error": f"{type(exc).__name__}: {exc}"}
+            continue
+        dictamen = dictamen_text(percent, thresholds)
+        row["engines"][name] = {
+            "seconds": elapsed,
+            "percent": percent,
+            "dictamen": dictamen,
+            "text_equal": text == ref_text,
+            "criterion_diffs": [
+                {"criterion": k, "reference": ref_scores.get(k), "engine": scores.get(k)}
+                for k in ref_scores.keys() | scores.keys()
+                if ref_scores.get(k) != scores.get(k)
+            ],
+            "dictamen_equal": dictamen == ref_dictamen,
+        }
+    return row
+
+
+def summarize(rows: list[dict], engine_names: list[str]) -> dict:
+    """
+    Exactitud por criterio y por dictamen, y aceleración total por motor, sobre los
+    informes que pudieron compararse; `failed` cuenta los que fallaron (en el motor
+    o en la referencia).
+    """
+    summary = {}
+    for name in engine_names:
+        ok_rows = [r for r in rows if "error" not in r and "error" not in r["engines"][name]]
+        results = [r["engines"][name] for r in ok_rows]
+        criteria = sum(len(r["reference"]["scores"]) for r in ok_rows)
+        diffs = sum(len(e["criterion_diffs"]) for e in results)
+        ref_total = sum(r["reference"]["seconds"] for r in ok_rows)
+        total = sum(e["seconds"] for e in results)
+        summary[name] = {
+            "files": len(ok_rows),
+            "failed": len(rows) - len(ok_rows),
+            "criterion_accuracy": 1 - diffs / criteria if criteria else 1.0,
+            "criterion_diffs": diffs,
+            "dictamen_accuracy": (
+                sum(e["dictamen_equal"] for e in results) / len(ok_rows) if ok_rows else 1.0
+            ),
+            "text_equal": sum(e["text_equal"] for e in results),
+            "reference_seconds": ref_total,
+            "engine_seconds": total,
+            "speedup": ref_total / total if total > 0 else float("inf"),
+        }
+    return summary
+
+
+def _print_report(rows: list[dict], summary: dict) -> None:
+    for r in rows:
+        if "error" in r:
+            print(f"{r['file']}: error en {r['error']}")
+            continue
+        ref = r["reference"]
+        for name, e in r["engines"].items():
+            if "error" in e:
+                print(f"{r['file']} [{name}]: error {e['error']}")
+                continue
+            if not e["criterion_diffs"] and e["dictamen_equal"]:
+                continue
+            print(f"{r['file']} [{name}]")
+            for d in sorted(e["criterion_diffs"], key=lambda d: d["criterion"]):
+                print(f"  {d['criterion']}: referencia {d['reference']} → motor {d['engine']}")
+            print(
+                f"  porcentaje {ref['percent']:.2f} → {e['percent']:.2f}"
+                f" · dictamen {ref['dictamen']} → {e['dictamen']}"
+            )
+    print()
+    print("| Motor | Informes | Fallidos | Exactitud criterios | Exactitud dictamen | Texto idéntico | Referencia (s) | Motor (s) | Aceleración |")
+    print("|---|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for name, s in summary.items():
+        print(
+            f"| {name} | {s['files']} | {s['failed']} | {s['criterion_accuracy']:.2%} |"
+            f" {s['dictamen_accuracy']:.2%} | {s['text_equal']}/{s['files']} |"
+            f" {s['reference_seconds']:.2f} | {s['engine_seconds']:.2f} | {s['speedup']:.2f}× |"
+        )
+
+
+# ============================
+# CORPUS SINTÉTICO
+# ============================
+def _pdf_escape(line: str) -> bytes:
+    raw = line.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_pdf(path: Path, pages: list[list[str]]) -> None:
+    """PDF mínimo (Helvetica, WinAnsi) con una lista de líneas por página."""
+    objects: list[bytes] = []
+    n_pages = len(pages)
+    font_id = 3
+    page_ids = [4 + 2 * i for i in range(n_pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = b" ".join(f"{pid} 0 R".encode() for pid in page_ids)
+    objects.append(b"<< /Type /Pages /Kids [" + kids + b"] /Count " + str(n_pages).encode() + b" >>")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for i, lines in enumerate(pages):
+        content = b"BT /F1 10 Tf 14 TL 50 800 Td " + b" ".join(
+            b"(" + _pdf_escape(line) + b") Tj T*" for line in lines
+        ) + b" ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {page_ids[i] + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def make_fixtures(out_dir: Path, keywords: dict, seed: int = 0) -> list[Path]:
+    """Corpus sintético: PDF de varias páginas, DOCX con celdas combinadas y textos con acentos."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    indicios = [k for keys in keywords.values() for k in keys]
+    relleno = "el la de los informe proyecto se realizó durante período según".split()
+    acentos = "ÉTICA Metodología INVESTIGACIÓN difusión Formación Año señalización Cumplimiento".split()
+
+    def linea(density: float) -> str:
+        words = [rng.choice(indicios) if rng.random() < density else rng.choice(relleno + acentos) for _ in range(10)]
+        return " ".join(words)
+
+    written = []
+    for n_pages, density in ((3, 0.05), (40, 0.02), (120, 0.01)):
+        path = out_dir / f"informe_{n_pages}p.pdf"
+        write_pdf(path, [[linea(density) for _ in range(50)] for _ in range(n_pages)])
+        written.append(path)
+
+    doc = Document()
+    doc.add_paragraph("Informe de avance — Investigación en Ciencias de la Educación")
+    table = doc.add_table(rows=4, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2)).text = "Unidad académica: Facultad de Educación · Código 2024-ÉT"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "Director: Dra. Núñez · Codirector: Lic. Peña"
+    table.cell(1, 1).text = "Cronograma: etapa 2 con retraso"
+    table.cell(3, 1).merge(table.cell(3, 2)).text = "Difusión: congreso nacional, publicación en revista"
+    for _ in range(200):
+        doc.add_paragraph(linea(0.03))
+    path = out_dir / "informe_celdas_combinadas.docx"
+    doc.save(path)
+    written.append(path)
+
+    doc = Document()
+    for _ in range(300):
+        doc.add_paragraph(" ".join(rng.choice(acentos + indicios).upper() for _ in range(12)))
+    path = out_dir / "informe_acentos_mayusculas.docx"
+    doc.save(path)
+    written.append(path)
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Validación diferencial contra el puntaje de referencia.")
+    parser.add_argument("corpus", nargs="?", type=Path, help="Directorio con informes PDF/DOCX.")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        default=None,
+        help="Motor candidato: streaming, streaming-preview o modulo:funcion (repetible).",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por informe (se toma el mínimo).")
+    parser.add_argument("--rubric", type=Path, default=_APP_DIR / "rubric_config.yaml")
+    parser.add_argument("--json", type=Path, default=None, help="Guarda detalle y resumen en JSON.")
+    parser.add_argument("--make-fixtures", type=Path, default=None, help="Genera un corpus sintético y termina.")
+    args = parser.parse_args(argv)
+
+    with open(args.rubric, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    if args.make_fixtures is not None:
+        for path in make_fixtures(args.make_fixtures.expanduser(), config["keywords"]):
+            print(path)
+        return 0
+    if args.corpus is None:
+        parser.error("indicar el directorio del corpus (o --make-fixtures)")
+
+    files = sorted(
+        p for p in args.corpus.expanduser().rglob("*") if p.suffix.lower() in (".pdf", ".docx")
+    )
+    if not files:
+        print(f"Error: no hay informes PDF/DOCX en {args.corpus}", file=sys.stderr)
+        return 1
+    engines = {spec: load_engine(spec) for spec in (args.engine or ["streaming"])}
+
+    rows = [compare_file(p, engines, config, max(1, args.repeat)) for p in files]
+    summary = summarize(rows, list(engines))
+    _print_report(rows, summary)
+    if args.json is not None:
+        args.json.write_text(
+            json.dumps({"files": rows, "summary": summary}, indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
+    ok = all(
+        s["failed"] == 0 and s["criterion_diffs"] == 0 and s["dictamen_accuracy"] == 1.0
+        for s in summary.values()
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
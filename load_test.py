@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga: N sesiones concurrentes de la app sobre informes de ejemplo.
+
+Cada sesión (un `AppTest` de Streamlit en su propio hilo, como en el servidor)
+sube un informe, mueve los sliders de ajuste manual y genera los informes.
+Para cada N se mide la latencia por rerun (p50/p90/p99), reruns por segundo y
+la memoria residente del proceso: antes de los niveles se corre una sesión de
+calentamiento (imports, cachés), y durante cada nivel un hilo muestrea el RSS;
+la memoria por sesión es (pico − base) / N, con la base tomada al inicio del nivel.
+
+Uso:
+  python load_test.py informes/*.pdf informes/*.docx
+  python load_test.py informes/ --sessions 1,2,4,8,16 --slider-moves 5 --json carga.json
+
+`AppTest` no puede simular la carga de archivos, así que el script de prueba
+reemplaza `st.file_uploader` por uno que devuelve el informe asignado a la
+sesión; el resto de `app.py` corre sin cambios. El historial se escribe en un
+directorio temporal. `AppTest` reejecuta el script completo aun para widgets
+dentro de un `st.fragment` (ajuste manual), así que la latencia de los sliders
+medida aquí es una cota superior de la que ve el evaluador.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+_APP_DIR = Path(__file__).resolve().parent
+
+
+def _app_driver(app_path: str, app_dir: str) -> None:
+    """Script que ejecuta AppTest: `app.py` con la carga de archivo simulada."""
+    import io
+    import sys
+    from pathlib import Path
+
+    import streamlit as st
+
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+
+    def _fixture_uploader(*args, **kwargs):
+        path = st.session_state.get("_loadtest_fixture")
+        if not path:
+            return None
+        if "_loadtest_bytes" not in st.session_state:
+            st.session_state["_loadtest_bytes"] = Path(path).read_bytes()
+        upload = io.BytesIO(st.session_state["_loadtest_bytes"])
+        upload.name = Path(path).name
+        upload.file_id = path
+        return upload
+
+    st.file_uploader = _fixture_uploader
+    with open(app_path, "r", encoding="utf-8") as f:
+        code = compile(f.read(), app_path, "exec")
+    exec(code, {"__name__": "__main__", "__file__": app_path})
+
+
+def _rss_mib() -> float:
+    """Memoria residente actual del proceso (MiB); pico si /proc no está disponible."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class _PeakRssSampler:
+    """Hilo que muestrea el RSS cada `interval` segundos y guarda el máximo."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = _rss_mib()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_mib())
+
+    def __enter__(self) -> "_PeakRssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_mib())
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _run_session(fixture: Path, slider_moves: int, timeout: float, seed: int) -> list[float]:
+    """Una sesión completa; devuelve la latencia (s) de cada rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_function(
+        _app_driver,
+        kwargs={"app_path": str(_APP_DIR / "app.py"), "app_dir": str(_APP_DIR)},
+        default_timeout=timeout,
+    )
+    at.session_state["_loadtest_fixture"] = str(fixture)
+    latencies: list[float] = []
+
+    def timed(run) -> None:
+        t0 = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(f"{fixture.name}: {at.exception[0].message}")
+
+    timed(at.run)
+    for _ in range(slider_moves):
+        if not at.slider:
+            break
+        slider = rng.choice(list(at.slider))
+        timed(slider.set_value(rng.randint(0, 4)).run)
+    generar = [b for b in at.button if b.label == "Generar informes"]
+    if generar:
+        timed(generar[0].click().run)
+    return latencies
+
+
+def run_level(fixtures: list[Path], sessions: int, slider_moves: int, timeout: float) -> dict:
+    """Lanza `sessions` sesiones a la vez y agrega sus métricas."""
+    rss_baseline = _rss_mib()
+    start = time.perf_counter()
+    with _PeakRssSampler() as sampler, ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [
+            pool.submit(_run_session, fixtures[i % len(fixtures)], slider_moves, timeout, i)
+            for i in range(sessions)
+        ]
+        latencies = [lat for fut in futures for lat in fut.result()]
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "elapsed_s": elapsed,
+        "reruns_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p90_ms": _percentile(latencies, 0.90) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "rss_baseline_mib": rss_baseline,
+        "rss_peak_mib": sampler.peak,
+        "rss_per_session_mib": max(0.0, sampler.peak - rss_baseline) / sessions,
+        "threads": threading.active_count(),
+    }
+
+
+def _collect_fixtures(paths: list[str]) -> list[Path]:
+    fixtures: list[Path] = []
+    for raw in paths:
+        p = Path(raw).expanduser()
+        if p.is_dir():
+            fixtures += sorted(q for q in p.iterdir() if q.suffix.lower() in (".pdf", ".docx"))
+        elif p.is_file():
+            fixtures.append(p)
+    return fixtures
+
+
+def _print_report(results: list[dict], p90_target_ms: float) -> None:
+    print(
+        "| Sesiones | Reruns | Reruns/s | p50 (ms) | p90 (ms) | p99 (ms)"
+        " | RSS base (MiB) | RSS pico (MiB) | RSS/sesión (MiB) |"
+    )
+    print("|---:|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for r in results:
+        print(
+            f"| {r['sessions']} | {r['reruns']} | {r['reruns_per_s']:.1f} | {r['p50_ms']:.0f} |"
+            f" {r['p90_ms']:.0f} | {r['p99_ms']:.0f} | {r['rss_baseline_mib']:.0f} |"
+            f" {r['rss_peak_mib']:.0f} | {r['rss_per_session_mib']:.1f} |"
+        )
+    ok = [r["sessions"] for r in results if r["p90_ms"] <= p90_target_ms]
+    print()
+    if ok:
+        print(f"Sesiones concurrentes por instancia con p90 ≤ {p90_target_ms:.0f} ms: {max(ok)}")
+    else:
+        print(f"Ningún nivel cumple p90 ≤ {p90_target_ms:.0f} ms.")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga con sesiones concurrentes (AppTest).")
+    parser.add_argument("fixtures", nargs="+", help="Informes PDF/DOCX o directorios que los contengan.")
+    parser.add_argument("--sessions", default="1,2,4,8", help="Niveles de concurrencia, separados por coma.")
+    parser.add_argument("--slider-moves", type=int, default=5, help="Movimientos de slider por sesión.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Tiempo máximo por rerun (s).")
+    parser.add_argument("--p90-target-ms", type=float, default=1000.0, help="Objetivo de latencia p90.")
+    parser.add_argument("--json", type=Path, default=None, help="Guarda los resultados en JSON.")
+    args = parser.parse_args(argv)
+
+    fixtures = _collect_fixtures(args.fixtures)
+    if not fixtures:
+        print("Error: no se encontraron informes PDF/DOCX.", file=sys.stderr)
+        return 1
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["LEDGER_PATH"] = str(Path(tmp) / "historial_carga.sqlite")
+        # Calentamiento: imports, cachés de Streamlit y de la rúbrica no se cargan al primer nivel.
+        print("Calentamiento…", file=sys.stderr)
+        _run_session(fixtures[0], slider_moves=1, timeout=args.timeout, seed=-1)
+        results = []
+        for n in levels:
+            print(f"Nivel {n} sesiones…", file=sys.stderr)
+            results.append(run_level(fixtures, n, args.slider_moves, args.timeout))
+
+    print(f"Informes de prueba: {len(fixtures)} · movimientos de slider por sesión: {args.slider_moves}")
+    print()
+    _print_report(results, args.p90_target_ms)
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""
+Perfilado opcional (cProfile + tracemalloc) de extracción (con puntaje) y exportación.
+
+Se activa con la variable de entorno `VALORADOR_PROFILE=1` (o desde la barra
+lateral si `VALORADOR_PROFILE_ADMIN=1`). Por cada etapa de cada rerun escribe en
+`VALORADOR_PROFILE_DIR` (por defecto `profiles/` del repo):
+  - `<fecha>_<hash>_<etapa>.prof`  volcado de cProfile (abrir con `pstats` o snakeviz)
+  - `<fecha>_<hash>_<etapa>.txt`   asignaciones principales de tracemalloc y etiquetas
+Se conservan sólo los últimos `VALORADOR_PROFILE_KEEP` pares (por defecto 200).
+
+Con el modo apagado `profile_stage` devuelve un contexto nulo: no hay costo.
+"""
+from __future__ import annotations
+
+import cProfile
+import contextlib
+import hashlib
+import os
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+_APP_DIR = Path(__file__).resolve().parent
+
+_TRUTHY = ("1", "true", "yes", "si", "sí", "on")
+
+ENV_ENABLED = os.environ.get("VALORADOR_PROFILE", "").strip().lower() in _TRUTHY
+ADMIN_TOGGLE = os.environ.get("VALORADOR_PROFILE_ADMIN", "").strip().lower() in _TRUTHY
+
+_TOP_ALLOCATIONS = 25
+
+# tracemalloc es global al proceso y varias sesiones pueden perfilar a la vez:
+# se inicia con el primer perfil activo y se detiene con el último.
+_TRACE_LOCK = threading.Lock()
+_active_profiles = 0
+_started_tracing = False
+
+
+def profile_dir() -> Path:
+    return Path(os.environ.get("VALORADOR_PROFILE_DIR", str(_APP_DIR / "profiles"))).expanduser()
+
+
+def _keep() -> int:
+    try:
+        return max(1, int(os.environ.get("VALORADOR_PROFILE_KEEP", "200")))
+    except ValueError:
+        return 200
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _rotate(directory: Path) -> None:
+    """Borra los perfiles más viejos dejando los últimos `VALORADOR_PROFILE_KEEP`."""
+    profiles = sorted(directory.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for old in profiles[: max(0, len(profiles) - _keep())]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".txt").unlink(missing_ok=True)
+
+
+def _trace_acquire() -> None:
+    global _active_profiles, _started_tracing
+    with _TRACE_LOCK:
+        if _active_profiles == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _active_profiles += 1
+
+
+def _trace_release() -> None:
+    global _active_profiles, _started_tracing
+    with _TRACE_LOCK:
+        _active_profiles -= 1
+        if _active_profiles == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+@contextlib.contextmanager
+def _profiled(stage: str, tags: dict):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    _trace_acquire()
+    # Con perfiles simultáneos el pico incluye asignaciones de las otras sesiones.
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        enabled = True
+    except ValueError:
+        # Otro hilo ya tiene un perfilador activo (Python >= 3.12): el .prof queda vacío.
+        enabled = False
+    try:
+        yield tags
+    finally:
+        if enabled:
+            profiler.disable()
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            _trace_release()
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        base = directory / f"{stamp}_{tags.get('file_hash', 'sin-archivo')}_{stage}"
+        profiler.dump_stats(base.with_suffix(".prof"))
+        lines = [f"etapa: {stage}"]
+        lines += [f"{k}: {v}" for k, v in tags.items()]
+        lines.append(f"memoria actual: {current / 1024:.1f} KiB · pico: {peak / 1024:.1f} KiB")
+        lines.append("")
+        lines.append(f"Top {_TOP_ALLOCATIONS} asignaciones (tracemalloc, por línea):")
+        for stat in snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]:
+            lines.append(str(stat))
+        base.with_suffix(".txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        _rotate(directory)
+
+
+def profile_stage(stage: str, enabled: bool, **tags):
+    """
+    Contexto que perfila una etapa (`extraccion`, `exportacion`) si `enabled`.
+    Las etiquetas (p. ej. `file_hash`, `pages`) van al `.txt` y el hash al nombre
+    de archivo. El contexto entrega el dict de etiquetas para agregar las que sólo
+    se conocen al terminar la etapa.
+    """
+    if not enabled:
+        return contextlib.nullcontext({})
+    return _profiled(stage, dict(tags))
@@ -7,14 +7,32 @@ Uso:
 
 Por defecto repite los puntajes del ejemplo que el usuario había exportado (66% con rúbrica vieja).
 Con la rúbrica nueva (Anexo V) el porcentaje total cambia aunque los 0–4 sean iguales.
+
+Modo masivo (un par xlsx/docx por registro, en paralelo):
+  python regenerate_exports.py --scores puntajes.jsonl --out-dir ~/Downloads/dictamenes
+  python regenerate_exports.py --scores puntajes.csv --zip dictamenes.zip --workers 4
+
+  JSONL: una línea por proyecto, {"proyecto": "...", "scores": {"identificacion": 4, ...}}
+  CSV:   columna `proyecto` y una columna por criterio (claves de `weights`).
+
+  `--out-dir` y `--zip` son excluyentes. Cada puntaje debe ser un entero 0–4; los
+  registros inválidos se informan y se omiten (código de salida 1).
 """
 from __future__ import annotations
 
+import argparse
+import csv
 import io
+import json
 import os
+import re
 import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator
 
 import yaml
 from docx import Document
@@ -101,10 +119,195 @@ def generate_word(scores, percent, thresholds, nombre_proyecto: str, label_fn):
     return buf.getvalue()
 
 
-def main() -> int:
+def _load_config() -> dict:
     with open(_APP_DIR / "rubric_config.yaml", "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        return yaml.safe_load(f)
+
+
+def iter_score_records(path: Path) -> Iterator[dict | str]:
+    """
+    Registros crudos de un CSV (fila como dict) o JSONL (línea de texto), de a uno
+    y sin cargar el archivo entero. Se interpretan con `parse_score_record`.
+    `utf-8-sig` descarta el BOM que agrega Excel al exportar «CSV UTF-8».
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield line
+
+
+def _parse_score(key: str, value) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"{key}: puntaje no numérico {value!r}")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    try:
+        score = value if isinstance(value, int) else int(str(value).strip())
+    except (TypeError, ValueError):
+        raise ValueError(f"{key}: puntaje no numérico {value!r}") from None
+    if not 0 <= score <= 4:
+        raise ValueError(f"{key}: puntaje {score} fuera de la escala 0–4")
+    return score
+
+
+def parse_score_record(raw: dict | str, weights: dict) -> tuple[str, dict]:
+    """
+    (proyecto, puntajes ordenados como `weights`) de un registro crudo. Lanza
+    ValueError si el JSON es inválido, faltan o sobran criterios, o algún puntaje
+    no es un entero 0–4.
+    """
+    if isinstance(raw, dict):
+        row = dict(raw)
+        proyecto = (row.pop("proyecto", "") or "").strip()
+        raw_scores = {k: v for k, v in row.items() if k and (v or "").strip()}
+    else:
+        try:
+            rec = json.loads(raw)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"JSON inválido ({exc.msg})") from None
+        if not isinstance(rec, dict) or not isinstance(rec.get("scores") or {}, dict):
+            raise ValueError('se esperaba {"proyecto": ..., "scores": {...}}')
+        proyecto = str(rec.get("proyecto") or "").strip()
+        raw_scores = rec.get("scores") or {}
+
+    missing = set(weights) - set(raw_scores)
+    extra = set(raw_scores) - set(weights)
+    if missing or extra:
+        raise ValueError(f"{proyecto!r}: faltan {sorted(missing)}, sobran {sorted(extra)}")
+    try:
+        scores = {k: _parse_score(k, raw_scores[k]) for k in weights}
+    except ValueError as exc:
+        raise ValueError(f"{proyecto!r}: {exc}") from None
+    return proyecto, scores
+
+
+def _safe_name(nombre: str) -> str:
+    slug = re.sub(r"[^\w.-]+", "_", nombre, flags=re.UNICODE).strip("._")
+    return slug[:80] or "proyecto"
+
+
+# Estado por proceso del pool: la rúbrica se lee una vez por worker, no por registro.
+_WORKER_CONFIG: dict | None = None
+
+
+def _init_worker() -> None:
+    global _WORKER_CONFIG
+    _WORKER_CONFIG = _load_config()
+
+
+def _render_record(index: int, proyecto: str, scores: dict) -> tuple[int, str, bytes, bytes, float]:
+    """Genera el par xlsx/docx de un registro ya validado dentro de un worker."""
+    config = _WORKER_CONFIG or _load_config()
+    weights: dict = config["weights"]
+    labels: dict = config.get("labels") or {}
+
+    def criterion_label(key: str) -> str:
+        return labels.get(key, key.replace("_", " ").title())
+
+    percent = weighted_score(scores, weights)
+    xlsx_bytes = generate_excel(scores, percent, config["thresholds"], criterion_label)
+    docx_bytes = generate_word(scores, percent, config["thresholds"], proyecto, criterion_label)
+    return index, proyecto, xlsx_bytes, docx_bytes, percent
+
+
+def run_bulk(scores_path: Path, out_dir: Path | None, zip_path: Path | None, workers: int | None) -> int:
+    """
+    Regenera un par xlsx/docx por registro del archivo de puntajes.
+    A lo sumo `2 * workers` registros en vuelo: la memoria no crece con el tamaño de la entrada.
+    Los registros inválidos (o cuya generación falla) se cuentan como error y se sigue
+    con el resto.
+    """
+    weights: dict = _load_config()["weights"]
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    archive = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) if zip_path else None
+    if out_dir is not None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    def write_result(index: int, proyecto: str, xlsx_bytes: bytes, docx_bytes: bytes) -> None:
+        base = f"{index:05d}_{_safe_name(proyecto)}"
+        if archive is not None:
+            archive.writestr(f"{base}.xlsx", xlsx_bytes)
+            archive.writestr(f"{base}.docx", docx_bytes)
+        else:
+            (out_dir / f"{base}.xlsx").write_bytes(xlsx_bytes)
+            (out_dir / f"{base}.docx").write_bytes(docx_bytes)
+
+    done = errors = 0
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending: set = set()
+            futures_index: dict = {}
+
+            def drain(block_until: int) -> None:
+                nonlocal pending, done, errors
+                while len(pending) > block_until:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        try:
+                            index, proyecto, xlsx_bytes, docx_bytes, _ = fut.result()
+                        except Exception as exc:
+                            errors += 1
+                            print(f"Error: registro {futures_index.pop(fut)}: {exc}", file=sys.stderr)
+                            continue
+                        futures_index.pop(fut, None)
+                        write_result(index, proyecto, xlsx_bytes, docx_bytes)
+                        done += 1
+                        if done % 50 == 0:
+                            rate = done / (time.perf_counter() - start)
+                            print(f"  {done} dictámenes ({rate:.1f}/s)", file=sys.stderr)
+
+            for index, raw in enumerate(iter_score_records(scores_path), start=1):
+                try:
+                    proyecto, scores = parse_score_record(raw, weights)
+                except ValueError as exc:
+                    errors += 1
+                    print(f"Error: registro {index}: {exc}", file=sys.stderr)
+                    continue
+                fut = pool.submit(_render_record, index, proyecto, scores)
+                futures_index[fut] = index
+                pending.add(fut)
+                drain(max_in_flight - 1)
+            drain(0)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    elapsed = time.perf_counter() - start
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print("Rúbrica:", _APP_DIR / "rubric_config.yaml")
+    print(f"Generados: {done} pares xlsx/docx en {elapsed:.1f} s ({rate:.1f} dictámenes/s, {workers} procesos)")
+    if errors:
+        print(f"Registros con error: {errors}", file=sys.stderr)
+    print("Destino:", zip_path if archive is not None else out_dir)
+    return 1 if errors else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Regenera dictámenes Excel/Word con la rúbrica actual.")
+    parser.add_argument("--scores", type=Path, help="CSV o JSONL con (proyecto, puntajes) por registro.")
+    destino = parser.add_mutually_exclusive_group()
+    destino.add_argument("--out-dir", type=Path, help="Directorio de salida (modo masivo).")
+    destino.add_argument("--zip", type=Path, help="Escribe todos los archivos en un único ZIP.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del pool (por defecto, CPUs).")
+    args = parser.parse_args(argv)
+
+    if args.scores is not None:
+        out_dir = args.out_dir
+        if out_dir is None and args.zip is None:
+            out_dir = Path(os.environ.get("OUT_DIR", str(Path.home() / "Downloads")))
+        return run_bulk(
+            args.scores.expanduser(),
+            out_dir.expanduser() if out_dir is not None else None,
+            args.zip.expanduser() if args.zip is not None else None,
+            args.workers,
+        )
 
+    config = _load_config()
     weights: dict = config["weights"]
     thresholds = config["thresholds"]
     labels: dict = config.get("labels") or {}
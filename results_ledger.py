@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Historial local de valoraciones (SQLite indexado).
+
+Cada evaluación finalizada en `app.py` se agrega con puntajes automáticos y
+manuales por criterio, porcentaje, dictamen, proyecto, período, hash de la
+rúbrica y fecha. Las consultas agregan directamente en SQL sobre índices por
+proyecto y período, y la distribución por criterio sale de la tabla acumulada
+`score_counts`.
+
+Uso (CLI):
+  python results_ledger.py proyecto "Nombre del proyecto"
+  python results_ledger.py distribucion --periodo 2025-1
+  python results_ledger.py resumen
+  LEDGER_PATH=/ruta/historial.sqlite python results_ledger.py resumen
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+_APP_DIR = Path(__file__).resolve().parent
+
+DEFAULT_LEDGER_PATH = _APP_DIR / "data" / "historial_valoraciones.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    fingerprint TEXT,
+    project TEXT NOT NULL,
+    period TEXT NOT NULL,
+    rubric_hash TEXT NOT NULL,
+    file_name TEXT NOT NULL DEFAULT '',
+    auto_percent REAL NOT NULL,
+    percent REAL NOT NULL,
+    dictamen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    evaluation_id INTEGER NOT NULL REFERENCES evaluations(id) ON DELETE CASCADE,
+    criterion TEXT NOT NULL,
+    auto_score INTEGER NOT NULL,
+    manual_score INTEGER NOT NULL,
+    PRIMARY KEY (evaluation_id, criterion)
+) WITHOUT ROWID;
+-- Acumulados por (período, criterio, nivel): las distribuciones se leen de aquí sin
+-- recorrer los puntajes individuales, por grande que sea el historial.
+CREATE TABLE IF NOT EXISTS score_counts (
+    period TEXT NOT NULL,
+    criterion TEXT NOT NULL,
+    manual_score INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    auto_sum INTEGER NOT NULL,
+    PRIMARY KEY (period, criterion, manual_score)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_evaluations_project ON evaluations(project, created_at);
+CREATE INDEX IF NOT EXISTS ix_evaluations_period ON evaluations(period, percent, dictamen);
+"""
+
+# Milisegundos que una escritura espera si otro proceso (p. ej. la CLI) tiene el archivo bloqueado.
+_BUSY_TIMEOUT_MS = 5000
+
+
+class LedgerConnection(sqlite3.Connection):
+    """
+    Conexión compartida entre los hilos de Streamlit: cada uso (lectura o
+    transacción completa) toma `lock`, así las transacciones de sesiones
+    concurrentes no se mezclan.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+
+def ledger_path() -> Path:
+    """Ruta del historial (variable de entorno `LEDGER_PATH` o `data/` del repo)."""
+    return Path(os.environ.get("LEDGER_PATH", str(DEFAULT_LEDGER_PATH))).expanduser()
+
+
+def rubric_hash(path: Path | str) -> str:
+    """SHA-256 corto del archivo de rúbrica, para distinguir versiones de ponderación."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def connect(path: Path | str | None = None) -> sqlite3.Connection:
+    """Abre (o crea) el historial y asegura esquema e índices."""
+    path = Path(path) if path is not None else ledger_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # check_same_thread=False: Streamlit reutiliza la conexión entre hilos de rerun;
+    # la serialización la da `LedgerConnection.lock`.
+    conn = sqlite3.connect(path, check_same_thread=False, factory=LedgerConnection)
+    conn.row_factory = sqlite3.Row
+    with conn.lock:
+        conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.executescript(_SCHEMA)
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(evaluations)")}
+        if "fingerprint" not in columns:
+            # Historiales creados antes de la detección de duplicados.
+            conn.execute("ALTER TABLE evaluations ADD COLUMN fingerprint TEXT")
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_evaluations_fingerprint ON evaluations(fingerprint)"
+        )
+        # Ninguna consulta lo usa (la distribución lee `score_counts`); sólo encarecía cada alta.
+        conn.execute("DROP INDEX IF EXISTS ix_scores_criterion")
+        conn.commit()
+    return conn
+
+
+def _locked(conn: sqlite3.Connection):
+    """Lock de la conexión compartida (contexto nulo para conexiones sqlite3 comunes)."""
+    return getattr(conn, "lock", None) or contextlib.nullcontext()
+
+
+def _fingerprint(project: str, period: str, rubric: str, file_name: str, manual_scores: dict) -> str:
+    """Identifica una misma valoración (proyecto, período, rúbrica, archivo y puntajes)."""
+    payload = "\x1f".join(
+        [project, period, rubric, file_name]
+        + [f"{k}={int(v)}" for k, v in sorted(manual_scores.items())]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_evaluation(
+    conn: sqlite3.Connection,
+    *,
+    project: str,
+    period: str,
+    rubric: str,
+    auto_scores: dict,
+    manual_scores: dict,
+    auto_percent: float,
+    percent: float,
+    dictamen: str,
+    file_name: str = "",
+    created_at: datetime | None = None,
+) -> int | None:
+    """
+    Agrega una evaluación finalizada y sus puntajes por criterio. Devuelve su id,
+    o None si la misma valoración ya estaba registrada (p. ej. dos clics en
+    «Generar informes»). Proyecto y período son obligatorios.
+    """
+    project = (project or "").strip()
+    period = (period or "").strip()
+    if not project or not period:
+        raise ValueError("El proyecto y el período son obligatorios para el historial.")
+    created = (created_at or datetime.now()).isoformat(timespec="seconds")
+    rows = [(k, int(auto_scores.get(k, 0)), int(v)) for k, v in manual_scores.items()]
+    fingerprint = _fingerprint(project, period, rubric, file_name or "", manual_scores)
+    with _locked(conn), conn:
+        cur = conn.execute(
+            "INSERT INTO evaluations"
+            " (created_at, fingerprint, project, period, rubric_hash, file_name,"
+            " auto_percent, percent, dictamen)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (fingerprint) DO NOTHING",
+            (
+                created,
+                fingerprint,
+                project,
+                period,
+                rubric,
+                file_name or "",
+                float(auto_percent),
+                float(percent),
+                dictamen,
+            ),
+        )
+        if cur.rowcount == 0:
+            return None
+        evaluation_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO scores (evaluation_id, criterion, auto_score, manual_score)"
+            " VALUES (?, ?, ?, ?)",
+            [(evaluation_id, k, a, m) for k, a, m in rows],
+        )
+        conn.executemany(
+            "INSERT INTO score_counts (period, criterion, manual_score, n, auto_sum)"
+            " VALUES (?, ?, ?, 1, ?)"
+            " ON CONFLICT (period, criterion, manual_score)"
+            " DO UPDATE SET n = n + 1, auto_sum = auto_sum + excluded.auto_sum",
+            [(period, k, m, a) for k, a, m in rows],
+        )
+    return evaluation_id
+
+
+def project_history(
+    conn: sqlite3.Connection, project: str, limit: int | None = None
+) -> list[dict]:
+    """Evaluaciones de un proyecto, más recientes primero (p. ej. últimos 4 períodos)."""
+    sql = (
+        "SELECT id, created_at, period, rubric_hash, auto_percent, percent, dictamen"
+        " FROM evaluations WHERE project = ? ORDER BY created_at DESC"
+    )
+    params: list = [(project or "").strip()]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    with _locked(conn):
+        return [dict(r) for r in conn.execute(sql, params)]
+
+
+def project_scores(conn: sqlite3.Connection, evaluation_id: int) -> dict[str, tuple[int, int]]:
+    """Puntajes (automático, manual) por criterio de una evaluación."""
+    with _locked(conn):
+        rows = conn.execute(
+            "SELECT criterion, auto_score, manual_score FROM scores WHERE evaluation_id = ?",
+            (evaluation_id,),
+        ).fetchall()
+    return {r["criterion"]: (r["auto_score"], r["manual_score"]) for r in rows}
+
+
+def criterion_distribution(
+    conn: sqlite3.Connection, period: str | None = None
+) -> list[dict]:
+    """
+    Distribución de puntajes manuales 0–4 por criterio (cantidad por nivel,
+    promedio manual y automático). Con `period`, restringe a esa convocatoria.
+    """
+    where = ""
+    params: list = []
+    if period:
+        where = " WHERE period = ?"
+        params.append(period.strip())
+    sql = (
+        "SELECT criterion, SUM(n) AS n,"
+        " CAST(SUM(manual_score * n) AS REAL) / SUM(n) AS avg_manual,"
+        " CAST(SUM(auto_sum) AS REAL) / SUM(n) AS avg_auto,"
+        " SUM(CASE WHEN manual_score = 0 THEN n ELSE 0 END) AS n0,"
+        " SUM(CASE WHEN manual_score = 1 THEN n ELSE 0 END) AS n1,"
+        " SUM(CASE WHEN manual_score = 2 THEN n ELSE 0 END) AS n2,"
+        " SUM(CASE WHEN manual_score = 3 THEN n ELSE 0 END) AS n3,"
+        " SUM(CASE WHEN manual_score = 4 THEN n ELSE 0 END) AS n4"
+        f" FROM score_counts{where} GROUP BY criterion ORDER BY criterion"
+    )
+    with _locked(conn):
+        return [dict(r) for r in conn.execute(sql, params)]
+
+
+def period_summary(conn: sqlite3.Connection) -> list[dict]:
+    """Resumen por período: cantidad, promedio y conteo por dictamen."""
+    with _locked(conn):
+        rows = conn.execute(
+            "SELECT period, COUNT(*) AS n, AVG(percent) AS avg_percent,"
+            " MIN(percent) AS min_percent, MAX(percent) AS max_percent,"
+            " SUM(dictamen = 'Aprobado') AS aprobados,"
+            " SUM(dictamen = 'Aprobado con observaciones') AS aprobados_obs,"
+            " SUM(dictamen = 'No aprobado') AS no_aprobados"
+            " FROM evaluations GROUP BY period ORDER BY period DESC"
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def list_projects(conn: sqlite3.Connection) -> list[str]:
+    with _locked(conn):
+        rows = conn.execute(
+            "SELECT DISTINCT project FROM evaluations WHERE project <> '' ORDER BY project"
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+def list_periods(conn: sqlite3.Connection) -> list[str]:
+    with _locked(conn):
+        rows = conn.execute(
+            "SELECT DISTINCT period FROM evaluations WHERE period <> '' ORDER BY period DESC"
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+def _print_rows(rows: list[dict]) -> None:
+    if not rows:
+        print("(sin resultados)")
+        return
+    cols = list(rows[0].keys())
+    print("\t".join(cols))
+    for r in rows:
+        print("\t".join(f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c]) for c in cols))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Consultas sobre el historial de valoraciones.")
+    parser.add_argument("--db", default=None, help="Ruta del historial (por defecto LEDGER_PATH).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_proj = sub.add_parser("proyecto", help="Evaluaciones de un proyecto.")
+    p_proj.add_argument("nombre")
+    p_proj.add_argument("--ultimas", type=int, default=None)
+    p_dist = sub.add_parser("distribucion", help="Distribución de puntajes por criterio.")
+    p_dist.add_argument("--periodo", default=None)
+    sub.add_parser("resumen", help="Resumen por período.")
+    args = parser.parse_args(argv)
+
+    path = Path(args.db).expanduser() if args.db else ledger_path()
+    if not path.is_file():
+        print(f"Error: no existe el historial {path}", file=sys.stderr)
+        return 1
+    conn = connect(path)
+    try:
+        if args.cmd == "proyecto":
+            _print_rows(project_history(conn, args.nombre, args.ultimas))
+        elif args.cmd == "distribucion":
+            _print_rows(criterion_distribution(conn, args.periodo))
+        else:
+            _print_rows(period_summary(conn))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
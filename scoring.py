@@ -0,0 +1,90 @@
+"""
+Ruta de referencia de la valoración: extracción de texto, puntaje automático por
+cobertura de indicios, puntaje ponderado y dictamen.
+
+Sin dependencias de Streamlit, para poder usarla desde scripts (p. ej.
+`differential_check.py`, que valida motores alternativos contra esta ruta).
+"""
+from __future__ import annotations
+
+import pdfplumber
+from docx import Document
+
+
+def _docx_paragraphs_and_tables(doc: Document) -> str:
+    """Incluye tablas (plantilla Anexo II suele tener datos en celdas)."""
+    parts: list[str] = []
+    for p in doc.paragraphs:
+        t = (p.text or "").strip()
+        if t:
+            parts.append(p.text)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                c = (cell.text or "").strip()
+                if c:
+                    parts.append(c)
+    return "\n".join(parts)
+
+
+def extract_text(file):
+    """Extrae texto desde PDF o DOCX."""
+    if file.name.endswith(".pdf"):
+        text = ""
+        with pdfplumber.open(file) as pdf:
+            for page in pdf.pages:
+                text += (page.extract_text() or "") + "\n"
+        return text
+    if file.name.endswith(".docx"):
+        doc = Document(file)
+        return _docx_paragraphs_and_tables(doc)
+    return ""
+
+# Cobertura a partir de la cual el puntaje es 4. `streaming_score` importa la
+# constante para cortar la búsqueda; los umbrales de `auto_score` se mantienen en
+# línea para que la referencia no comparta código con el motor que valida.
+SATURATION_RATIO = 0.45
+
+
+def auto_score(text, keywords_dict):
+    """
+    Puntaje automático 0–4 por criterio según cobertura de indicios normativos
+    (listas `keywords` en rubric_config.yaml). Mapea la proporción de indicios
+    hallados en el texto a la escala 0–4 del Anexo V.
+    """
+    text_low = (text or "").lower()
+    scores: dict[str, int] = {}
+    for section, keys in keywords_dict.items():
+        keylist = [(k or "").strip() for k in keys if (k or "").strip()]
+        if not keylist:
+            scores[section] = 0
+            continue
+        hits = sum(1 for k in keylist if k.lower() in text_low)
+        ratio = hits / len(keylist)
+        # Umbrales de cobertura → escala cualitativa 0–4
+        if ratio >= 0.45:
+            scores[section] = 4
+        elif ratio >= 0.30:
+            scores[section] = 3
+        elif ratio >= 0.15:
+            scores[section] = 2
+        elif ratio > 0:
+            scores[section] = 1
+        else:
+            scores[section] = 0
+    return scores
+
+def weighted_score(scores, weights):
+    """Calcula el puntaje total ponderado (%) a partir de puntajes 0–4"""
+    total = sum(scores[s] * weights[s] for s in scores)
+    max_total = sum(weights.values()) * 4
+    percent = (total / max_total) * 100 if max_total > 0 else 0.0
+    return percent
+
+def dictamen_text(percent, thresholds):
+    """Dictamen (sin íconos) para exportación e historial."""
+    if percent >= thresholds["aprobado"]:
+        return "Aprobado"
+    if percent >= thresholds["aprobado_obs"]:
+        return "Aprobado con observaciones"
+    return "No aprobado"
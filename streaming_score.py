@@ -0,0 +1,260 @@
+"""
+Extracción y puntaje fusionados: el texto se puntúa página a página mientras se extrae.
+
+El puntaje de un criterio sólo puede subir a medida que aparece texto, y una vez
+que su cobertura llega a 0.45 (banda 4) ya no cambia. Así se pueden publicar
+puntajes provisorios desde la primera página y, en modo vista rápida, cortar la
+extracción cuando todos los criterios están saturados o se agota el presupuesto
+de páginas. En modo completo el texto y los puntajes finales son idénticos a
+`extract_text` + `auto_score` de `scoring.py`.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import pdfplumber
+from docx import Document
+
+from scoring import SATURATION_RATIO
+
+# Clave interna de la rúbrica principal (`rubric_config.yaml`) en `MultiRubricScorer`.
+PRIMARY_RUBRIC = ""
+
+
+def coverage_score(ratio: float) -> int:
+    """Umbrales de cobertura → escala cualitativa 0–4 (Anexo V)."""
+    if ratio >= SATURATION_RATIO:
+        return 4
+    if ratio >= 0.30:
+        return 3
+    if ratio >= 0.15:
+        return 2
+    if ratio > 0:
+        return 1
+    return 0
+
+
+def iter_text_chunks(file, on_total_pages: Callable[[int], None] | None = None) -> Iterator[str]:
+    """
+    Trozos de texto en orden de lectura (una página en PDF, un párrafo o celda en
+    DOCX). Su concatenación es exactamente el texto de `extract_text`. En PDF,
+    `on_total_pages` recibe la cantidad de páginas al abrir el archivo.
+    """
+    if file.name.endswith(".pdf"):
+        with pdfplumber.open(file) as pdf:
+            if on_total_pages is not None:
+                on_total_pages(len(pdf.pages))
+            for page in pdf.pages:
+                yield (page.extract_text() or "") + "\n"
+                # Libera objetos de layout de páginas ya leídas.
+                page.close()
+        return
+    if file.name.endswith(".docx"):
+        doc = Document(file)
+        first = True
+        for p in doc.paragraphs:
+            if (p.text or "").strip():
+                yield p.text if first else "\n" + p.text
+                first = False
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    c = (cell.text or "").strip()
+                    if c:
+                        yield c if first else "\n" + c
+                        first = False
+
+
+def _keyword_pattern(keys) -> str:
+    """
+    Alternancia de `keys` en forma de trie (`metodo(?:logia)?`): en cada posición
+    el motor descarta casi todos los indicios con el primer carácter y prefiere
+    la coincidencia más larga.
+    """
+    trie: dict = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else f"(?:{'|'.join(alts)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class MultiRubricScorer:
+    """
+    Puntaje por cobertura de indicios para varias rúbricas a la vez, alimentado
+    por trozos de texto. Los indicios de todas las rúbricas se unifican en una
+    sola expresión regular (alternancia de los pendientes), así cada trozo se
+    recorre una vez para todos los indicios; cada hallazgo se acredita a todos
+    los criterios (de cualquier rúbrica) que lo listan.
+    """
+
+    def __init__(self, rubrics: dict[str, dict]):
+        self._totals: dict[tuple[str, str], int] = {}
+        self._hits: dict[tuple[str, str], int] = {}
+        # indicio (minúsculas) → criterios que lo listan, con repetición si aparece dos veces.
+        self._pending: dict[str, list[tuple[str, str]]] = {}
+        for rubric, keywords_dict in rubrics.items():
+            for section, keys in keywords_dict.items():
+                keylist = [(k or "").strip() for k in keys if (k or "").strip()]
+                target = (rubric, section)
+                self._totals[target] = len(keylist)
+                self._hits[target] = 0
+                for k in keylist:
+                    self._pending.setdefault(k.lower(), []).append(target)
+        # Arrastre entre trozos para no perder indicios que cruzan un salto de página.
+        self._overlap = max((len(k) for k in self._pending), default=1) - 1
+        self._tail = ""
+        self._matcher: re.Pattern | None = None
+        self._matcher_size = 0
+
+    def _score(self, target: tuple[str, str]) -> int:
+        total = self._totals[target]
+        return coverage_score(self._hits[target] / total) if total else 0
+
+    def rubric_scores(self) -> dict[str, dict[str, int]]:
+        """Puntajes 0–4 por rúbrica y criterio."""
+        out: dict[str, dict[str, int]] = {}
+        for rubric, section in self._totals:
+            out.setdefault(rubric, {})[section] = self._score((rubric, section))
+        return out
+
+    def _saturated(self, target: tuple[str, str]) -> bool:
+        total = self._totals[target]
+        return not total or self._hits[target] / total >= SATURATION_RATIO
+
+    @property
+    def saturated(self) -> bool:
+        """True si ningún puntaje puede cambiar con más texto."""
+        return not self._pending
+
+    def feed(self, chunk: str) -> bool:
+        """Procesa un trozo de texto; devuelve True si cambió algún puntaje."""
+        if not self._pending:
+            return False
+        window = self._tail + chunk.lower()
+        changed = False
+        found = self._find_pending(window)
+        for key in found:
+            for target in self._pending.pop(key):
+                before = self._score(target)
+                self._hits[target] += 1
+                changed = changed or self._score(target) != before
+        if found:
+            # Los indicios cuyos criterios ya están todos saturados no necesitan buscarse.
+            self._pending = {
+                k: targets
+                for k, targets in self._pending.items()
+                if not all(self._saturated(t) for t in targets)
+            }
+        self._tail = window[-self._overlap:] if self._overlap else ""
+        return changed
+
+    def _find_pending(self, window: str) -> set[str]:
+        """Indicios pendientes que aparecen en `window` (misma semántica que `k in window`)."""
+        if self._matcher is None or len(self._pending) <= self._matcher_size // 2:
+            self._matcher = re.compile(f"(?=({_keyword_pattern(self._pending)}))")
+            self._matcher_size = len(self._pending)
+        found: set[str] = set()
+        for match in {m.group(1) for m in self._matcher.finditer(window)}:
+            # En cada posición la expresión toma el indicio más largo; los pendientes
+            # que empiezan ahí son prefijos de él. El patrón puede incluir indicios ya
+            # descartados (se recompila sólo cuando quedan la mitad): se filtran aquí.
+            found.update(match[:i] for i in range(1, len(match) + 1) if match[:i] in self._pending)
+        return found
+
+
+@dataclass
+class ScoreUpdate:
+    """Puntajes provisorios tras leer `pages` trozos (páginas en PDF)."""
+
+    pages: int
+    total_pages: int | None
+    scores: dict[str, int]
+    saturated: bool
+
+
+class StreamingEvaluation:
+    """
+    Extrae y puntúa en una sola pasada. `updates()` publica puntajes provisorios
+    cada vez que cambian. Con `preview=True` se detiene al saturar todos los
+    criterios o al llegar a `page_budget`; en ese caso `complete` queda en False
+    y `text` es parcial. `extra_rubrics` ({nombre: keywords}) se puntúan en la
+    misma pasada (ver `rubric_scores`). `total_pages` se conoce al abrir el PDF
+    (None en DOCX o antes de `updates()`).
+    """
+
+    def __init__(
+        self,
+        file,
+        keywords_dict: dict,
+        preview: bool = False,
+        page_budget: int | None = None,
+        extra_rubrics: dict[str, dict] | None = None,
+    ):
+        self.file = file
+        self.preview = preview
+        self.page_budget = page_budget
+        self.scorer = MultiRubricScorer({PRIMARY_RUBRIC: keywords_dict, **(extra_rubrics or {})})
+        self.total_pages: int | None = None
+        self.pages = 0
+        self.complete = False
+        self._chunks: list[str] = []
+        self._length = 0
+        # Offset de inicio de cada trozo en `text` (página en PDF); base del visor paginado.
+        self.chunk_offsets: list[int] = []
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def scores(self) -> dict[str, int]:
+        """Puntajes de la rúbrica principal."""
+        return self.scorer.rubric_scores().get(PRIMARY_RUBRIC, {})
+
+    def rubric_scores(self) -> dict[str, dict[str, int]]:
+        """Puntajes de las rúbricas adicionales, por nombre."""
+        scores = self.scorer.rubric_scores()
+        scores.pop(PRIMARY_RUBRIC, None)
+        return scores
+
+    def _set_total_pages(self, total: int) -> None:
+        self.total_pages = total
+
+    def updates(self) -> Iterator[ScoreUpdate]:
+        chunks = iter_text_chunks(self.file, on_total_pages=self._set_total_pages)
+        try:
+            for chunk in chunks:
+                self.chunk_offsets.append(self._length)
+                self._length += len(chunk)
+                self._chunks.append(chunk)
+                self.pages += 1
+                if self.scorer.feed(chunk) or self.pages == 1:
+                    yield ScoreUpdate(self.pages, self.total_pages, self.scores(), self.scorer.saturated)
+                if self.preview and (
+                    self.scorer.saturated
+                    or (self.page_budget is not None and self.pages >= self.page_budget)
+                ):
+                    # Cortar en el último trozo también es una lectura completa. En PDF se
+                    # sabe por la cantidad de páginas; en DOCX se mira si queda otro
+                    # bloque (barato: no hay que extraer una página).
+                    if self.total_pages is not None:
+                        self.complete = self.pages >= self.total_pages
+                    else:
+                        self.complete = next(chunks, None) is None
+                    break
+            else:
+                self.complete = True
+        finally:
+            chunks.close()
+        yield ScoreUpdate(self.pages, self.total_pages, self.scores(), self.scorer.saturated)
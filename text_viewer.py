@@ -0,0 +1,88 @@
+"""
+Visor paginado del texto extraído: índice de ventanas y de apariciones de indicios.
+
+En lugar de enviar el texto completo al navegador en cada rerun, la app muestra
+una ventana (una página del PDF, o hasta `max_window` caracteres) y navega por
+número de ventana o saltando a las ventanas donde aparece un indicio. El
+tamaño de lo que se envía no depende del tamaño del documento.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+
+# Tamaño máximo de una ventana (caracteres).
+DEFAULT_WINDOW = 8 * 1024
+
+
+def _split_long(start: int, end: int, text: str, max_window: int) -> list[int]:
+    """Cortes dentro de un tramo largo, preferentemente en un salto de línea."""
+    starts = [start]
+    while end - starts[-1] > max_window:
+        limit = starts[-1] + max_window
+        cut = text.rfind("\n", starts[-1] + 1, limit)
+        starts.append(cut + 1 if cut > starts[-1] else limit)
+    return starts
+
+
+def window_index(
+    text: str,
+    chunk_offsets: list[int],
+    merge_chunks: bool = False,
+    max_window: int = DEFAULT_WINDOW,
+) -> list[int]:
+    """
+    Offsets de inicio de cada ventana. Sin `merge_chunks` cada trozo (página de
+    PDF) es una ventana; con `merge_chunks` (párrafos de DOCX) se agrupan trozos
+    consecutivos hasta `max_window`. Los tramos más largos se parten.
+    """
+    n = len(text)
+    if n == 0:
+        return [0]
+    bounds = sorted({o for o in chunk_offsets if 0 <= o < n} | {0})
+    if merge_chunks:
+        merged = [0]
+        for b in bounds[1:]:
+            if b - merged[-1] >= max_window:
+                merged.append(b)
+        bounds = merged
+    starts: list[int] = []
+    for i, b in enumerate(bounds):
+        end = bounds[i + 1] if i + 1 < len(bounds) else n
+        starts += _split_long(b, end, text, max_window)
+    return starts
+
+
+def window_bounds(starts: list[int], text_len: int, i: int) -> tuple[int, int]:
+    """(inicio, fin) de la ventana `i` (base 0)."""
+    end = starts[i + 1] if i + 1 < len(starts) else text_len
+    return starts[i], end
+
+
+def keyword_hit_windows(
+    text: str, keywords_dict: dict, starts: list[int], max_hits: int = 200
+) -> dict[str, list[int]]:
+    """
+    Ventanas (base 0, sin repetir) donde aparece cada indicio, con a lo sumo
+    `max_hits` apariciones por indicio. Indicios sin apariciones se omiten.
+    """
+    text_low = text.lower()
+    hits: dict[str, list[int]] = {}
+    seen: set[str] = set()
+    for keys in keywords_dict.values():
+        for k in keys:
+            k = (k or "").strip().lower()
+            if not k or k in seen:
+                continue
+            seen.add(k)
+            windows: list[int] = []
+            pos = text_low.find(k)
+            count = 0
+            while pos >= 0 and count < max_hits:
+                w = bisect_right(starts, pos) - 1
+                if not windows or windows[-1] != w:
+                    windows.append(w)
+                count += 1
+                pos = text_low.find(k, pos + 1)
+            if windows:
+                hits[k] = windows
+    return hits
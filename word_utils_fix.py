@@ -1,9 +1,17 @@
 
 # word_utils_fix.py
+import re
+from xml.sax.saxutils import escape
+
 from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
 from typing import List, Optional
 
+# Caracteres de control que no admite XML (aparecen en texto extraído de PDF).
+_XML_INVALID = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
 def add_full_text(doc: Document, text: Optional[str] = None):
     """Agrega texto completo preservando párrafos y saltos de línea.
     No acorta ni agrega '...'.
@@ -17,6 +25,56 @@ def add_full_text(doc: Document, text: Optional[str] = None):
             doc.add_paragraph(line)
         doc.add_paragraph('')  # separación entre bloques
 
+def _run_xml(text: str, bold: bool = False) -> str:
+    props = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    return f'<w:r>{props}<w:t xml:space="preserve">{escape(_XML_INVALID.sub("", text))}</w:t></w:r>'
+
+def _paragraph_xml(lines: List[str], bold_prefix: str = "") -> str:
+    """Un párrafo con las líneas unidas por saltos de línea suaves (<w:br/>)."""
+    parts = [_run_xml(bold_prefix, bold=True)] if bold_prefix else []
+    for i, line in enumerate(lines):
+        if i:
+            parts.append("<w:r><w:br/></w:r>")
+        if line:
+            parts.append(_run_xml(line))
+    return f"<w:p>{''.join(parts)}</w:p>"
+
+def _append_body_xml(doc: Document, paragraphs_xml: List[str]):
+    """Inserta todos los párrafos en el cuerpo de una vez (antes de sectPr)."""
+    if not paragraphs_xml:
+        return
+    container = parse_xml(f"<w:body {nsdecls('w')}>{''.join(paragraphs_xml)}</w:body>")
+    body = doc.element.body
+    sect_pr = body.sectPr
+    idx = body.index(sect_pr) if sect_pr is not None else len(body)
+    body[idx:idx] = list(container)
+
+def add_full_text_bulk(doc: Document, text: Optional[str] = None):
+    """Como `add_full_text`, pero arma el XML de todo el texto y lo agrega en una sola operación.
+    Cada bloque (separado por línea en blanco) es un párrafo; sus líneas se unen con saltos
+    suaves en lugar de un párrafo por línea. No acorta ni agrega '...'.
+    """
+    if not text:
+        return
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    _append_body_xml(doc, [_paragraph_xml(block.split('\n')) for block in text.split('\n\n')])
+
+def add_evidence_annex(doc: Document, evidence: dict, label_fn=None,
+                       titulo: str = "Anexo de evidencias"):
+    """Anexo sólo con los fragmentos donde aparecen los indicios hallados.
+    `evidence` es {criterio: [(indicio, fragmento), ...]} (ver `keyword_evidence` en app.py).
+    """
+    if not evidence:
+        return
+    label_fn = label_fn or (lambda k: str(k))
+    doc.add_heading(titulo, level=2)
+    paragraphs = []
+    for section, found in evidence.items():
+        paragraphs.append(_paragraph_xml([], bold_prefix=f"{label_fn(section)} ({len(found)} indicios)"))
+        for keyword, snippet in found:
+            paragraphs.append(_paragraph_xml([f"…{snippet}…"], bold_prefix=f"{keyword}: "))
+    _append_body_xml(doc, paragraphs)
+
 def add_table(doc: Document, headers, rows):
     if not headers or rows is None:
         return
@@ -51,15 +109,15 @@ def export_informe_avance(path: str,
     d.add_paragraph("")
 
     d.add_paragraph("Dictamen")
-    add_full_text(d, dictamen)
+    add_full_text_bulk(d, dictamen)
 
     if interpretacion:
         d.add_paragraph("Interpretación")
-        add_full_text(d, interpretacion)
+        add_full_text_bulk(d, interpretacion)
 
     if observaciones:
         d.add_paragraph("Observaciones")
-        add_full_text(d, observaciones)
+        add_full_text_bulk(d, observaciones)
 
     if tablas:
         for titulo, data in tablas.items():